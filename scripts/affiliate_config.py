@@ -7,6 +7,8 @@ Configure your affiliate tags and link patterns here.
 # Your affiliate tags - Use environment variables for production
 # These can be set in Vercel environment variables
 import os
+import re
+from urllib.parse import urlencode, urlsplit
 
 AFFILIATE_TAGS = {
     # Amazon affiliate tag
@@ -61,6 +63,21 @@ AFFILIATE_URL_PATTERNS = {
     # Add more patterns as needed for other merchants
 }
 
+# Shorteners and affiliate networks whose links must be followed to find the merchant
+REDIRECTOR_DOMAINS = {
+    'amzn.to', 'a.co', 'bit.ly', 'tinyurl.com', 't.co', 'ow.ly', 'goo.gl',
+    'linksynergy.com', 'skimresources.com', 'redirectingat.com', 'awin1.com',
+    'anrdoezrs.net', 'dpbolvw.net', 'jdoqocy.com', 'kqzyfj.com', 'tkqlhce.com',
+    'shareasale.com', 'pxf.io', 'sjv.io', 'rstyle.me', 'howl.me',
+}
+
+# Redirect-style paths (e.g. smartcanucks.ca/go/...) on any domain
+REDIRECTOR_PATH_PREFIXES = ('/go/', '/out/', '/r/', '/goto/', '/redirect')
+
+# Compile each rewrite pattern once at load instead of on every URL
+for _pattern_config in AFFILIATE_URL_PATTERNS.values():
+    _pattern_config['_compiled'] = re.compile(_pattern_config['pattern'])
+
 # Default affiliate redirect system
 DEFAULT_AFFILIATE_SYSTEM = {
     'enabled': True,
@@ -68,6 +85,7 @@ DEFAULT_AFFILIATE_SYSTEM = {
     'redirect_path': '/go/',  # Path for redirect links
     'track_clicks': True,
     'add_utm_params': True,
+    'resolve_workers': 16,  # Concurrent HEAD requests when resolving links
 }
 
 # UTM parameters for tracking
@@ -78,25 +96,65 @@ UTM_PARAMS = {
     'utm_content': 'rss_item',
 }
 
+# Pre-encoded UTM query string (UTM_PARAMS is constant)
+UTM_QUERY_STRING = urlencode(UTM_PARAMS)
+
+# Placeholder markers - tags containing these are treated as unset
+PLACEHOLDER_PATTERNS = (
+    'your-', 'yourtag-', 'example-', 'test-', 'placeholder-',
+    'your_', 'yourtag_', 'example_', 'test_', 'placeholder_',
+    'REPLACE', 'CHANGE', 'TODO'
+)
+
+# Hashed lookups keyed by apex domain, built once at import
+_AFFILIATE_HOSTS = frozenset(AFFILIATE_TAGS)
+_TAG_BY_HOST = {
+    affiliate_domain: tag
+    for affiliate_domain, tag in AFFILIATE_TAGS.items()
+    if tag and not any(pattern in tag for pattern in PLACEHOLDER_PATTERNS)
+}
+
+_RESOLVABLE_HOSTS = _AFFILIATE_HOSTS | frozenset(REDIRECTOR_DOMAINS)
+
+def _match_domain(domain, hosts):
+    """Return the first parent domain of a host (www.amazon.ca -> amazon.ca) in hosts."""
+    host = domain.lower().rsplit('@', 1)[-1].split(':', 1)[0]
+    if host.startswith('www.'):
+        host = host[4:]
+    
+    parts = host.split('.')
+    for i in range(len(parts) - 1):
+        candidate = '.'.join(parts[i:])
+        if candidate in hosts:
+            return candidate
+    return None
+
+def match_affiliate_domain(domain):
+    """Find the configured affiliate domain a host belongs to, or None."""
+    return _match_domain(domain, _AFFILIATE_HOSTS)
+
 def get_affiliate_tag(domain):
     """Get affiliate tag for a specific domain."""
-    for affiliate_domain, tag in AFFILIATE_TAGS.items():
-        if affiliate_domain in domain.lower():
-            # Only return tag if it's not a placeholder
-            placeholder_patterns = [
-                'your-', 'yourtag-', 'example-', 'test-', 'placeholder-',
-                'your_', 'yourtag_', 'example_', 'test_', 'placeholder_',
-                'REPLACE', 'CHANGE', 'TODO'
-            ]
-            if tag and not any(pattern in tag for pattern in placeholder_patterns):
-                return tag
-    return None
+    affiliate_domain = match_affiliate_domain(domain)
+    if affiliate_domain is None:
+        return None
+    # Only configured (non-placeholder) tags are present in the lookup
+    return _TAG_BY_HOST.get(affiliate_domain)
 
 def should_affiliate_link(url):
     """Check if a URL should be converted to an affiliate link."""
-    domain = url.lower()
-    return any(affiliate_domain in domain for affiliate_domain in AFFILIATE_TAGS.keys())
+    return match_affiliate_domain(urlsplit(url).netloc) is not None
+
+def should_resolve_link(url):
+    """Check if a URL could lead to an affiliate link and is worth resolving."""
+    try:
+        parsed = urlsplit(url)
+    except ValueError:
+        return False  # Malformed URL (e.g. a broken IPv6 host); keep it as is
+    if parsed.path.startswith(REDIRECTOR_PATH_PREFIXES):
+        return True
+    return _match_domain(parsed.netloc, _RESOLVABLE_HOSTS) is not None
 
 def get_utm_string():
     """Generate UTM parameter string."""
-    return '&'.join([f'{key}={value}' for key, value in UTM_PARAMS.items()])
\ No newline at end of file
+    return UTM_QUERY_STRING
\ No newline at end of file
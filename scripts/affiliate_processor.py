@@ -4,20 +4,35 @@ Affiliate link processor for RSS feeds.
 Processes and rewrites links to include affiliate tags.
 """
 
-import re
+import logging
 import urllib.parse
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit, parse_qs, urlencode
 from affiliate_config import (
     AFFILIATE_TAGS, 
     AFFILIATE_URL_PATTERNS, 
     DEFAULT_AFFILIATE_SYSTEM,
     UTM_PARAMS,
+    UTM_QUERY_STRING,
     get_affiliate_tag,
-    should_affiliate_link,
+    match_affiliate_domain,
+    should_resolve_link,
     get_utm_string
 )
 from link_resolver import LinkResolver
 
+logger = logging.getLogger(__name__)
+
+# Query parameter each affiliate domain expects its tag in (default 'aff')
+AFFILIATE_PARAM_NAMES = {
+    'amazon.ca': 'tag',
+    'amazon.com': 'tag',
+    'walmart.ca': 'affiliate',
+    'bestbuy.ca': 'ref',
+    'staples.ca': 'aff',
+    'adidas.ca': 'aff',
+}
+
 class AffiliateProcessor:
     """Process and rewrite affiliate links in RSS feed content."""
     
@@ -25,17 +40,19 @@ class AffiliateProcessor:
         self.config = config or DEFAULT_AFFILIATE_SYSTEM
         self.processed_count = 0
         self.skipped_count = 0
-        self.resolver = LinkResolver()
+        self.error_counts = Counter()
+        self.resolver = LinkResolver(max_workers=self.config.get('resolve_workers', 16))
     
-    def process_rss_entry(self, entry):
+    def process_rss_entry(self, entry, resolved_link=None):
         """Process a single RSS entry and rewrite affiliate links."""
         original_link = entry.get('link', '')
         
         # First resolve the link to get the clean final URL
-        resolved_link = self.resolver.resolve_url(original_link)
+        if resolved_link is None:
+            resolved_link = self._resolve_link(original_link)
         
-        # Then process the resolved link for affiliate tags
-        processed_link = self.process_link(resolved_link)
+        # Then process the resolved link for affiliate tags (no second resolve)
+        processed_link = self._process_resolved(resolved_link)
         entry['link'] = processed_link
         
         # Track if we processed this link
@@ -50,6 +67,32 @@ class AffiliateProcessor:
         
         return entry
     
+    def process_rss_entries(self, entries):
+        """Process RSS entries, resolving all of their links concurrently first."""
+        links = [entry.get('link', '') for entry in entries]
+        resolved = self.resolve_links(links)
+        resolved_links = [resolved.get(link, link) for link in links]
+        
+        # Affiliate rewriting is cheap CPU work, so it stays serial
+        return [
+            self.process_rss_entry(entry, resolved_link)
+            for entry, resolved_link in zip(entries, resolved_links)
+        ]
+    
+    def resolve_links(self, links):
+        """
+        Resolve a batch of links concurrently.
+        
+        Only links that can end up at an affiliate merchant need a network
+        call; results are also kept in the resolver cache, so this can be
+        used to warm it ahead of process_rss_entries.
+        
+        Returns:
+            dict: Resolved URL keyed by original link, for resolved links only
+        """
+        to_resolve = [link for link in links if should_resolve_link(link)]
+        return dict(zip(to_resolve, self.resolver.resolve_urls(to_resolve)))
+    
     def process_link(self, url):
         """Process a single URL: resolve → clean → add affiliate tags if available."""
         if not url or not self.config.get('enabled', True):
@@ -57,101 +100,117 @@ class AffiliateProcessor:
         
         try:
             # Step 1: Resolve the URL to get the final destination
-            resolved_url = self.resolver.resolve_url(url)
-            
-            # Step 2: Parse the resolved URL
-            parsed = urlparse(resolved_url)
+            resolved_url = self._resolve_link(url)
+        except Exception as e:
+            self.error_counts['process_link'] += 1
+            logger.debug("Error processing affiliate link %s: %s", url, e)
+            return url
+        
+        return self._process_resolved(resolved_url)
+    
+    def _resolve_link(self, url):
+        """Resolve a URL, skipping the network call when it can't become an affiliate link."""
+        if not should_resolve_link(url):
+            return url
+        return self.resolver.resolve_url(url)
+    
+    def _process_resolved(self, resolved_url):
+        """Add affiliate tags to an already resolved and cleaned URL."""
+        if not resolved_url or not self.config.get('enabled', True):
+            return resolved_url
+        
+        try:
+            # Step 2: Parse the resolved URL once; helpers share the result
+            parsed = urlsplit(resolved_url)
             domain = parsed.netloc.lower()
             
             # Step 3: Check if this domain should be processed
-            if not should_affiliate_link(resolved_url):
+            affiliate_domain = match_affiliate_domain(domain)
+            if affiliate_domain is None:
                 return resolved_url  # Return clean resolved URL
             
             # Step 4: Get affiliate tag for this domain
-            affiliate_tag = get_affiliate_tag(domain)
+            affiliate_tag = get_affiliate_tag(affiliate_domain)
             
             # Step 5: If no affiliate tag available, return clean URL
             if not affiliate_tag:
                 return resolved_url  # Clean URL, no affiliate tag
             
             # Step 6: Add affiliate tag to clean URL
-            return self._add_affiliate_tag(resolved_url, domain, affiliate_tag)
+            return self._add_affiliate_tag(parsed, affiliate_tag, affiliate_domain)
             
         except Exception as e:
-            print(f"Error processing affiliate link {url}: {e}")
-            return url
+            self.error_counts['process_link'] += 1
+            logger.debug("Error processing affiliate link %s: %s", resolved_url, e)
+            return resolved_url
     
     def _apply_affiliate_patterns(self, url, domain):
         """Apply specific affiliate URL patterns."""
         for affiliate_domain, pattern_config in AFFILIATE_URL_PATTERNS.items():
             if affiliate_domain in domain:
-                pattern = pattern_config['pattern']
+                pattern = pattern_config['_compiled']
                 rewrite = pattern_config['rewrite']
                 affiliate_tag = get_affiliate_tag(domain)
                 
                 if affiliate_tag:
                     # Apply the pattern replacement
-                    new_url = re.sub(pattern, rewrite.format(affiliate_tag=affiliate_tag), url)
+                    new_url = pattern.sub(rewrite.format(affiliate_tag=affiliate_tag), url)
                     if new_url != url:
-                        return self._add_utm_params(new_url)
+                        return self._add_utm_params(urlsplit(new_url))
         
         return url
     
-    def _add_affiliate_tag(self, url, domain, affiliate_tag):
-        """Add affiliate tag to clean URL based on merchant."""
+    def _add_affiliate_tag(self, parsed, affiliate_tag, affiliate_domain):
+        """Add affiliate tag to a parsed clean URL based on its matched affiliate domain."""
         try:
-            # Parse URL components
-            parsed = urlparse(url)
-            query_params = parse_qs(parsed.query)
+            # Pick the affiliate parameter name for this merchant (generic 'aff' otherwise)
+            param_name = AFFILIATE_PARAM_NAMES.get(affiliate_domain, 'aff')
             
-            # Add affiliate tag based on domain
-            if 'amazon' in domain:
-                query_params['tag'] = [affiliate_tag]
-            elif 'walmart' in domain:
-                query_params['affiliate'] = [affiliate_tag]
-            elif 'bestbuy' in domain:
-                query_params['ref'] = [affiliate_tag]
-            elif 'staples' in domain:
-                query_params['aff'] = [affiliate_tag]
-            elif 'adidas' in domain:
-                query_params['aff'] = [affiliate_tag]
-            else:
-                # Generic affiliate parameter
-                query_params['aff'] = [affiliate_tag]
+            # Fast path: cleaned product URLs usually have no query left
+            if not parsed.query:
+                new_query = urlencode({param_name: affiliate_tag})
+                if self.config.get('add_utm_params', True):
+                    new_query = f"{new_query}&{UTM_QUERY_STRING}"
+                return urlunsplit(parsed._replace(query=new_query))
             
-            # Rebuild URL with affiliate parameters
-            new_query = urlencode(query_params, doseq=True)
-            new_parsed = parsed._replace(query=new_query)
-            new_url = urlunparse(new_parsed)
+            query_params = parse_qs(parsed.query)
+            query_params[param_name] = [affiliate_tag]
             
-            return self._add_utm_params(new_url)
+            # Rebuild query with affiliate parameters
+            new_query = urlencode(query_params, doseq=True)
+            return self._add_utm_params(parsed._replace(query=new_query))
             
         except Exception as e:
-            print(f"Error adding affiliate tag to {url}: {e}")
-            return url
+            self.error_counts['affiliate_tag'] += 1
+            logger.debug("Error adding affiliate tag to %s: %s", urlunsplit(parsed), e)
+            return urlunsplit(parsed)
     
-    def _add_utm_params(self, url):
-        """Add UTM tracking parameters to URL."""
+    def _add_utm_params(self, parsed):
+        """Add UTM tracking parameters to a parsed URL and return it as a string."""
         if not self.config.get('add_utm_params', True):
-            return url
+            return urlunsplit(parsed)
         
         try:
-            parsed = urlparse(url)
-            query_params = parse_qs(parsed.query)
+            # Fast path: no UTM keys present, so append the prebuilt suffix
+            if not parsed.query:
+                return urlunsplit(parsed._replace(query=UTM_QUERY_STRING))
+            if 'utm_' not in parsed.query:
+                return urlunsplit(parsed._replace(query=f"{parsed.query}&{UTM_QUERY_STRING}"))
             
-            # Add UTM parameters
+            # Slow path: merge with UTM parameters already on the URL
+            query_params = parse_qs(parsed.query)
             for key, value in UTM_PARAMS.items():
                 if key not in query_params:
                     query_params[key] = [value]
             
             # Rebuild URL
             new_query = urlencode(query_params, doseq=True)
-            new_parsed = parsed._replace(query=new_query)
-            return urlunparse(new_parsed)
+            return urlunsplit(parsed._replace(query=new_query))
             
         except Exception as e:
-            print(f"Error adding UTM params to {url}: {e}")
-            return url
+            self.error_counts['utm_params'] += 1
+            logger.debug("Error adding UTM params to %s: %s", urlunsplit(parsed), e)
+            return urlunsplit(parsed)
     
     def create_redirect_link(self, original_url, title=""):
         """Create a redirect link through your own domain for tracking."""
@@ -184,17 +243,21 @@ class AffiliateProcessor:
             'processed': self.processed_count,
             'skipped': self.skipped_count,
             'total': self.processed_count + self.skipped_count,
-            'success_rate': self.processed_count / (self.processed_count + self.skipped_count) * 100 if (self.processed_count + self.skipped_count) > 0 else 0
+            'success_rate': self.processed_count / (self.processed_count + self.skipped_count) * 100 if (self.processed_count + self.skipped_count) > 0 else 0,
+            'errors': dict(self.error_counts + self.resolver.error_counts),
         }
+    
+    def log_error_summary(self):
+        """Log one warning summarizing errors instead of one line per URL."""
+        errors = self.get_stats()['errors']
+        if errors:
+            logger.warning("Affiliate processing errors (enable DEBUG for details): %s", errors)
 
 def process_feed_entries(entries, config=None):
-    """Process a list of RSS feed entries and add affiliate links."""
+    """Process a list of RSS feed entries and add affiliate links (entries are updated in place)."""
     processor = AffiliateProcessor(config)
     
-    processed_entries = []
-    for entry in entries:
-        processed_entry = processor.process_rss_entry(entry.copy())
-        processed_entries.append(processed_entry)
+    processed_entries = processor.process_rss_entries(entries)
     
     # Print statistics
     stats = processor.get_stats()
@@ -202,6 +265,7 @@ def process_feed_entries(entries, config=None):
     print(f"  - Processed: {stats['processed']} links")
     print(f"  - Skipped: {stats['skipped']} links")
     print(f"  - Success rate: {stats['success_rate']:.1f}%")
+    processor.log_error_summary()
     
     return processed_entries
 
@@ -226,6 +290,7 @@ if __name__ == "__main__":
         }
     ]
     
+    logging.basicConfig(format='%(levelname)s: %(message)s')
     print("Testing affiliate processing...")
     processed = process_feed_entries(test_entries)
     
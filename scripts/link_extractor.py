@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Merchant link extraction and classification for scraped posts.
+Finds the deal links in a post body and works out which merchant each one points to.
+"""
+
+from bs4 import BeautifulSoup
+import soupsieve
+from urllib.parse import urljoin, urlparse
+from typing import List, Dict, Optional, Tuple
+from post_scraper_config import (
+    MERCHANT_DOMAINS, LINK_AREA_SELECTORS, PRODUCT_URL_KEYWORDS, LINK_TYPE_RULES, SKIP_PATTERNS,
+    INTERNAL_DOMAINS, NAVIGATION_TEXT, DEAL_TEXT_PATTERNS, DEAL_CONTEXT_PATTERNS, DEAL_URL_PATTERNS,
+)
+
+try:
+    import ahocorasick  # optional, matches many keywords in one pass
+except ImportError:
+    ahocorasick = None
+
+# Compiled once at import, like post_extractor's content selectors. Link
+# walks stay find_all('a'), which beats an 'a[href]' selector.
+_LINK_AREA_CSS = tuple(soupsieve.compile(selector) for selector in LINK_AREA_SELECTORS)
+_AD_CSS = soupsieve.compile('.adthrive-ad')
+
+class KeywordMatcher:
+    """Test whether text contains any of a fixed set of keywords."""
+    
+    __slots__ = ('keywords', '_automaton')
+    
+    def __init__(self, keywords):
+        self.keywords = tuple(keywords)
+        self._automaton = None
+        
+        # One Aho-Corasick pass over the text instead of a scan per keyword
+        if ahocorasick is not None and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+    
+    def search(self, text: str) -> bool:
+        """Return True if any keyword occurs in text."""
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return any(keyword in text for keyword in self.keywords)
+
+class LinkExtractor:
+    """Find and classify the merchant links in a parsed post."""
+    
+    __slots__ = (
+        'merchant_domains', '_merchant_set', '_merchant_suffix_tuple',
+        '_skip_matcher', '_nav_matcher',
+        '_deal_text_matcher', '_deal_context_matcher', '_deal_url_matcher',
+    )
+    
+    def __init__(self):
+        # Merchant domains to look for (including shortlinks)
+        self.merchant_domains = MERCHANT_DOMAINS
+        
+        # Keyword matchers built once per extractor, reused for every link
+        self._skip_matcher = KeywordMatcher(SKIP_PATTERNS)
+        self._nav_matcher = KeywordMatcher(NAVIGATION_TEXT)
+        self._deal_text_matcher = KeywordMatcher(DEAL_TEXT_PATTERNS)
+        self._deal_context_matcher = KeywordMatcher(DEAL_CONTEXT_PATTERNS)
+        self._deal_url_matcher = KeywordMatcher(DEAL_URL_PATTERNS)
+        
+        # Hashed merchant lookup; hosts are matched by walking their parent domains
+        self._merchant_set = frozenset(self.merchant_domains)
+        
+        # Subdomain suffixes for a single C-level endswith() when only a yes/no is needed
+        self._merchant_suffix_tuple = tuple('.' + merchant for merchant in self.merchant_domains)
+    
+    def extract_links(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
+        """Extract all merchant links from the post."""
+        merchant_links = {}  # URL -> link data; first occurrence wins
+        
+        # Scheme-relative hrefs (//cdn...) take the post's scheme, as urljoin would
+        base_scheme = base_url.split(':', 1)[0] + ':'
+        
+        # Focus ONLY on the main blog post content, not navigation or sidebars
+        content_areas = self._find_link_areas(soup)
+        
+        # If no content areas found, fallback but be more selective
+        if not content_areas:
+            # Try to find the main content by looking for text content
+            for element in soup.find_all(['article', 'main', 'div']):
+                # get_text walks the whole subtree, so compute it once
+                if len(element.get_text(strip=True)) > 100:
+                    # Remove ad blocks first
+                    for ad in _AD_CSS.select(element):
+                        ad.decompose()
+                    content_areas = [element]
+                    break
+        
+        for content_area in content_areas:
+            # Find all links in the content area
+            all_links = content_area.find_all('a', href=True)
+            
+            for link in all_links:
+                href = link.get('href', '').strip()
+                if not href:
+                    continue
+                
+                # Skip internal SmartCanucks links, navigation, and social media
+                if self._skip_matcher.search(href.lower()):
+                    continue
+                
+                # Get link text early for filtering
+                link_text = link.get_text(strip=True)
+                
+                # Also skip if the link text suggests it's navigation
+                if self._nav_matcher.search(link_text.lower()):
+                    continue
+                
+                # Convert relative URLs to absolute (most hrefs already are)
+                if href.startswith(('http://', 'https://')):
+                    full_url = href
+                elif href.startswith('//'):
+                    full_url = base_scheme + href
+                else:
+                    full_url = urljoin(base_url, href)
+                
+                # Avoid duplicates (and re-classifying a URL already kept)
+                if full_url in merchant_links:
+                    continue
+                
+                # Parse and lowercase once; every classifier below shares these
+                try:
+                    domain = urlparse(full_url).netloc.lower().split(':', 1)[0].removeprefix('www.')
+                except ValueError:
+                    continue  # Malformed URL (e.g. a broken IPv6 host)
+                url_lower = full_url.lower()
+                
+                # Check if this is a deal link using intelligent detection
+                if self._is_deal_link(url_lower, domain, link, link_text):
+                    # Skip if link text is too generic or empty
+                    if not link_text or len(link_text) < 2:
+                        continue
+                    
+                    merchant, link_type = self._classify(url_lower, domain)
+                    link_data = {
+                        'url': full_url,
+                        'text': link_text,
+                        'merchant': merchant,
+                        'link_type': link_type,
+                    }
+                    merchant_links[full_url] = link_data
+        
+        return list(merchant_links.values())
+    
+    def _find_link_areas(self, soup: BeautifulSoup) -> List:
+        """
+        Find the post body containers to search for merchant links.
+        
+        Uses every match of the first LINK_AREA_SELECTORS entry that matches
+        anything. Containers nested inside another match are dropped, since
+        their links are already covered by the outer one. Only ad blocks are
+        stripped here, but PostExtractor.extract_all has already removed
+        CLUTTER_SELECTOR blocks (tags, related posts) from the content
+        element. Usually that is the same node, so only tag lists and related
+        posts outside the content element are still searched.
+        
+        Args:
+            soup (BeautifulSoup): Parsed post
+            
+        Returns:
+            list: Content area elements, in document order (may be empty)
+        """
+        areas = []
+        for selector in _LINK_AREA_CSS:
+            areas = selector.select(soup)
+            if areas:
+                break  # Use the first successful match to avoid duplicates
+        
+        area_ids = {id(area) for area in areas}
+        content_areas = [
+            area for area in areas
+            if not any(id(parent) in area_ids for parent in area.parents)
+        ]
+        
+        # Remove ad blocks first
+        for area in content_areas:
+            for ad in _AD_CSS.select(area):
+                ad.decompose()
+        
+        return content_areas
+    
+    def _is_deal_link(self, url_lower: str, domain: str, link_element, link_text: str) -> bool:
+        """
+        Intelligent detection of deal links based on context and content.
+        
+        Args:
+            url_lower (str): Absolute link URL, lowercased
+            domain (str): Lowercased host of the URL without port or leading www.
+            link_element: The <a> tag, for its parent context and attributes
+            link_text (str): The link's stripped text, as already computed by the caller
+            
+        Returns:
+            bool: True if the link looks like a deal link
+        """
+        try:
+            # The domain alone settles most links, so check it before any text scans
+            if domain in self._merchant_set or domain.endswith(self._merchant_suffix_tuple):
+                return True
+            if domain in INTERNAL_DOMAINS:
+                return False
+            
+            link_text = link_text.lower()
+            
+            # Check if link has deal-related text patterns
+            if self._deal_text_matcher.search(link_text):
+                return True
+            
+            # Check if link is in a deal context (look at parent elements)
+            parent = link_element.parent
+            if parent:
+                parent_text = parent.get_text(strip=True).lower()
+                
+                # Look for deal context in parent text
+                if self._deal_context_matcher.search(parent_text):
+                    return True
+            
+            # Check URL for deal patterns
+            if self._deal_url_matcher.search(url_lower):
+                return True
+            
+            # Check if link has special attributes that indicate it's a deal link
+            link_attrs = link_element.attrs
+            if 'data-deal' in link_attrs or 'data-offer' in link_attrs:
+                return True
+                
+            # Prioritize external links that might be deals (internal ones returned above)
+            if len(link_text) > 5:
+                # If it's an external link with substantial text, it's likely a deal
+                return True
+            
+            return False
+            
+        except Exception as e:
+            # If there's any error, be conservative and return False
+            return False
+    
+    def _match_merchant_domain(self, domain: str) -> Optional[str]:
+        """
+        Find the merchant domain a host belongs to (deals.amazon.ca -> amazon.ca).
+        
+        Checks each parent domain and then the host against the merchant set,
+        broadest first (store.epicgames.com -> epicgames.com), so results
+        don't depend on set order and lookalike hosts such as notamazon.com
+        no longer match.
+        
+        Args:
+            domain (str): Lowercased host without port or leading www.
+            
+        Returns:
+            Optional[str]: Matching merchant domain, or None
+        """
+        parts = domain.split('.')
+        for i in range(len(parts) - 2, -1, -1):
+            suffix = '.'.join(parts[i:])
+            if suffix in self._merchant_set:
+                return suffix
+        return None
+    
+    def _classify(self, url_lower: str, domain: str) -> Tuple[str, str]:
+        """
+        Identify a merchant link's merchant and link type together.
+        
+        Args:
+            url_lower (str): Absolute link URL, lowercased
+            domain (str): Lowercased host of the URL without port or leading www.
+            
+        Returns:
+            Tuple[str, str]: Merchant name ('unknown' if not a merchant domain) and link type
+        """
+        # Merchant comes from the host; amzn.to shortlinks belong to Amazon
+        if 'amzn.to' in domain:
+            merchant = 'amazon'
+        else:
+            merchant_domain = self._match_merchant_domain(domain)
+            if merchant_domain:
+                merchant = merchant_domain.replace('.ca', '').replace('.com', '')
+            else:
+                merchant = 'unknown'
+        
+        # Link type from the first merchant marker in the URL, else generic patterns
+        for marker, link_type in LINK_TYPE_RULES:
+            if marker in url_lower:
+                return merchant, link_type(url_lower)
+        
+        if any(keyword in url_lower for keyword in PRODUCT_URL_KEYWORDS):
+            return merchant, 'product_page'
+        
+        return merchant, 'merchant_page'
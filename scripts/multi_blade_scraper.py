@@ -5,22 +5,41 @@ Combines all scraping layers for maximum link extraction.
 """
 
 import json
+import logging
 import sys
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # Optional: much faster JSON encoding for large results
+except ImportError:
+    orjson = None
 
 from rss_to_json import parse_rss_feed
 from post_scraper import PostScraper
 from affiliate_processor import AffiliateProcessor
+from affiliate_config import DEFAULT_AFFILIATE_SYSTEM
 
 class MultiBladeScrap:
     """Multi-layered scraper for comprehensive link extraction."""
     
-    def __init__(self, max_posts=10, post_delay=(1, 3)):
-        self.post_scraper = PostScraper(delay_range=post_delay)
-        self.affiliate_processor = AffiliateProcessor()
+    def __init__(self, max_posts=10, post_delay=(1, 3), resolve_workers=16, post_workers=4, post_cache=None,
+                 parse_workers=0, posts_per_host=4, post_cache_max_age=None):
+        self.post_scraper = PostScraper(
+            delay_range=post_delay,
+            max_workers=post_workers,
+            cache_path=post_cache,
+            parse_workers=parse_workers,
+            max_per_host=posts_per_host,
+            max_age=post_cache_max_age,
+        )
+        self.affiliate_processor = AffiliateProcessor({
+            **DEFAULT_AFFILIATE_SYSTEM,
+            'resolve_workers': resolve_workers,
+        })
         self.max_posts = max_posts
         
     def scrape_feed_comprehensive(self, feed_url: str) -> Dict:
@@ -50,7 +69,18 @@ class MultiBladeScrap:
         
         # Extract post URLs for scraping
         post_urls = [entry['link'] for entry in rss_entries[:self.max_posts]]
-        scraped_posts = self.post_scraper.scrape_posts_batch(post_urls)
+        
+        # Posts are fetched a few at a time (same host, polite delay), and each
+        # post's merchant links are resolved in the background meanwhile so
+        # BLADE 3 mostly hits the resolver cache
+        scraped_posts = []
+        with ThreadPoolExecutor(max_workers=2) as resolve_executor:
+            for post in self.post_scraper.iter_scrape_posts(post_urls):
+                scraped_posts.append(post)
+                links = [link['url'] for link in post.get('merchant_links', [])]
+                if links:
+                    resolve_executor.submit(self.affiliate_processor.resolve_links, links)
+        self.post_scraper.save_cache()
         
         # Count total merchant links found
         total_merchant_links = sum(len(post.get('merchant_links', [])) for post in scraped_posts)
@@ -77,25 +107,21 @@ class MultiBladeScrap:
                 })
         
         # Process merchant links through affiliate system
-        processed_links = []
-        for link_data in all_merchant_links:
-            processed_entry = self.affiliate_processor.process_rss_entry(link_data.copy())
-            processed_links.append(processed_entry)
+        processed_links = self.affiliate_processor.process_rss_entries(all_merchant_links)
         
         # Get affiliate processing stats
         affiliate_stats = self.affiliate_processor.get_stats()
         print(f"   [+] Processed {affiliate_stats['processed']} links with affiliate tags")
         print(f"   [+] Skipped {affiliate_stats['skipped']} links")
         print(f"   [+] Success rate: {affiliate_stats['success_rate']:.1f}%")
+        self.affiliate_processor.log_error_summary()
         
         # BLADE 4: Combine and Structure Results
         print(f"\n[4] BLADE 4: Combining Results")
         
         # Combine RSS entries with their scraped content
         enhanced_entries = []
-        for i, rss_entry in enumerate(rss_entries):
-            enhanced_entry = rss_entry.copy()
-            
+        for i, enhanced_entry in enumerate(rss_entries):
             # Add scraped content if available
             if i < len(scraped_posts):
                 post_data = scraped_posts[i]
@@ -142,8 +168,12 @@ class MultiBladeScrap:
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
         
         print(f"\n[*] Results saved to: {output_file}")
         
@@ -167,13 +197,34 @@ def main():
                         help='Maximum number of posts to scrape')
     parser.add_argument('--delay', type=float, default=2.0,
                         help='Delay between post requests (seconds)')
+    parser.add_argument('--post-workers', type=int, default=4,
+                        help='Posts fetched concurrently (each still waits --delay)')
+    parser.add_argument('--resolve-workers', type=int, default=16,
+                        help='Concurrent requests when resolving merchant links')
+    parser.add_argument('--post-cache', default=None,
+                        help='JSON file of scraped posts and their ETags/Last-Modified for conditional re-scrapes')
+    parser.add_argument('--post-cache-max-age', type=float, default=None,
+                        help='Seconds a cached post is reused without revalidating it (also caches posts '
+                             'served without ETag/Last-Modified)')
+    parser.add_argument('--parse-workers', type=int, default=0, nargs='?', const=None,
+                        help='Processes for HTML parsing (0 parses in the fetch threads; '
+                             'no value uses one per CPU)')
+    parser.add_argument('--posts-per-host', type=int, default=4,
+                        help='Most post fetches in flight against a single host')
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
     
     # Initialize scraper
     scraper = MultiBladeScrap(
         max_posts=args.max_posts,
-        post_delay=(args.delay, args.delay + 1)
+        post_delay=(args.delay, args.delay + 1),
+        resolve_workers=args.resolve_workers,
+        post_workers=args.post_workers,
+        post_cache=args.post_cache,
+        parse_workers=args.parse_workers,
+        posts_per_host=args.posts_per_host,
+        post_cache_max_age=args.post_cache_max_age,
     )
     
     # Run comprehensive scraping
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Polite, cached fetching of WordPress post pages.
+Revalidates posts scraped on earlier runs and skips pages not worth parsing.
+"""
+
+import json
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+import time
+import random
+from typing import Dict, Optional
+import logging
+import threading
+from post_scraper_config import MAX_BODY_BYTES, HTML_CONTENT_TYPES, MAX_CACHE_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+class PostFetcher:
+    """Fetch post pages, reusing copies cached from earlier scrapes where they still hold."""
+    
+    __slots__ = (
+        'session', 'delay_range', 'timeout', 'cache_path', '_etag_cache', 'max_age',
+        'max_per_host', '_host_semaphores', '_host_lock',
+    )
+    
+    def __init__(self, delay_range=(1, 3), timeout=10, max_workers=4, cache_path=None, max_per_host=4,
+                 max_age=None):
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': ACCEPT_ENCODING,  # Adds br/zstd when their decoders are installed
+            'Connection': 'keep-alive',  # Reuse pooled connections across posts
+            'Upgrade-Insecure-Requests': '1',
+        })
+        self.delay_range = delay_range
+        self.timeout = timeout
+        
+        # Politeness cap: at most max_per_host fetches (delay included) against
+        # one host at a time, however many workers are running
+        self.max_per_host = max_per_host
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        
+        # Validators and scraped data per post URL, for conditional re-scrapes
+        self.cache_path = cache_path
+        self._etag_cache = self._load_cache()
+        
+        # Seconds a cached post is reused without even a conditional request
+        # (None always revalidates)
+        self.max_age = max_age
+        
+        # Retry rate limiting and transient server errors on GETs with
+        # exponential backoff (a 429/503's Retry-After header is honoured)
+        retry = Retry(
+            total=3, backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET',),
+            raise_on_status=False,
+        )
+        
+        # Larger pools keep connections to smartcanucks.ca and CDN hosts alive
+        # instead of evicting and re-handshaking past the default of 10
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max(64, max_workers), max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def cached_post(self, post_url: str) -> Optional[Dict]:
+        """Return a post cached within the last max_age seconds, if there is one."""
+        cached = self._etag_cache.get(post_url)
+        if cached and self.max_age is not None:
+            if time.time() - cached.get('fetched_at', 0) < self.max_age:
+                return {**cached['post_data'], 'scraped_at': time.time()}
+        return None
+    
+    def fetch(self, post_url: str) -> Dict:
+        """
+        Download a post page, revalidating any copy from an earlier scrape.
+        
+        Args:
+            post_url (str): URL of the WordPress post
+            
+        Returns:
+            dict: 'post_data' when there is nothing to parse (the cached post
+            was not modified, or the page was skipped); otherwise the 'body'
+            and its 'encoding', plus the 'etag' and 'last_modified' validators
+        """
+        cached = self._etag_cache.get(post_url)
+        
+        # Hold a slot for this host through the delay and the download only;
+        # parsing doesn't touch the network
+        with self._host_semaphore(post_url):
+            # Random delay to be respectful
+            if self.delay_range:
+                time.sleep(random.uniform(*self.delay_range))
+            
+            logger.info("Scraping post: %s", post_url)
+            
+            # Fetch the post content, revalidating any copy from an earlier scrape
+            headers = {}
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
+            
+            # Streamed so the body can be size-checked and read up to a cap
+            response = self.session.get(post_url, timeout=self.timeout, headers=headers, stream=True)
+            with response:
+                # Unchanged since last time: skip the download and the parse
+                if response.status_code == 304 and cached:
+                    logger.info("Post not modified, using cached data: %s", post_url)
+                    cached['fetched_at'] = time.time()
+                    return {'post_data': {**cached['post_data'], 'scraped_at': time.time()}}
+                
+                response.raise_for_status()
+                
+                # Links sometimes land on PDFs, images or JSON; don't fetch or parse those
+                content_type = response.headers.get('Content-Type', '').lower()
+                mime_type = content_type.split(';', 1)[0].strip()
+                if mime_type not in HTML_CONTENT_TYPES:
+                    logger.info("Skipping post %s: not HTML (%s)", post_url, mime_type)
+                    return {'post_data': {
+                        'url': post_url,
+                        'skipped': 'non-html',
+                        'content_type': mime_type,
+                        'scraped_at': time.time(),
+                    }}
+                
+                # Refuse a declared oversize body without downloading it
+                content_length = response.headers.get('Content-Length', '')
+                if content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+                    logger.warning("Skipping post %s: %s bytes exceeds %d", post_url, content_length, MAX_BODY_BYTES)
+                    return {'post_data': {
+                        'url': post_url,
+                        'skipped': 'too-large',
+                        'content_length': int(content_length),
+                        'scraped_at': time.time(),
+                    }}
+                
+                # Decompressed body, read up to the cap
+                body = response.raw.read(MAX_BODY_BYTES, decode_content=True)
+                
+                # Undeclared size (chunked or compressed): anything past the cap
+                # means the page is oversize, and a truncated copy must not be
+                # parsed or cached as if it were complete
+                if len(body) >= MAX_BODY_BYTES and response.raw.read(1, decode_content=True):
+                    logger.warning("Skipping post %s: body exceeds %d bytes", post_url, MAX_BODY_BYTES)
+                    return {'post_data': {
+                        'url': post_url,
+                        'skipped': 'too-large',
+                        'content_length': None,  # Not declared by the server
+                        'scraped_at': time.time(),
+                    }}
+        
+        # The header charset lets BS4 skip sniffing. Only an explicit charset
+        # counts: requests assumes ISO-8859-1 for a bare text/html, which
+        # would garble UTF-8 pages.
+        return {
+            'body': body,
+            'encoding': response.encoding if 'charset=' in content_type else None,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+    
+    def store(self, post_url: str, post_data: Dict, etag: Optional[str], last_modified: Optional[str]):
+        """
+        Remember a scraped post so the next scrape can reuse or revalidate it.
+        
+        Posts with an ETag or Last-Modified are always kept for conditional
+        requests. Without validators a post can only be reused as is, so
+        it's kept only when max_age is set.
+        """
+        if etag or last_modified or self.max_age is not None:
+            self._etag_cache[post_url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': post_data['scraped_at'],
+                'post_data': post_data,
+            }
+    
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """Get the semaphore bounding concurrent fetches to a URL's host."""
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._host_semaphores[host] = semaphore
+        return semaphore
+    
+    def _load_cache(self) -> Dict:
+        """Load the conditional-request cache from cache_path, if there is one."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable post cache %s: %s", self.cache_path, e)
+            return {}
+        
+        # Valid JSON of the wrong shape would break every lookup (and be saved back)
+        if not isinstance(cache, dict):
+            logger.warning("Ignoring post cache %s: expected an object, got %s", self.cache_path, type(cache).__name__)
+            return {}
+        return cache
+    
+    def save_cache(self):
+        """Persist the conditional-request cache so later runs can send If-None-Match."""
+        if not self.cache_path:
+            return
+        
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        
+        # Keep only the most recently fetched posts (entries from before
+        # fetched_at was recorded go first)
+        if len(self._etag_cache) > MAX_CACHE_ENTRIES:
+            newest = sorted(
+                self._etag_cache.items(),
+                key=lambda item: item[1].get('fetched_at', 0),
+                reverse=True,
+            )
+            self._etag_cache = dict(newest[:MAX_CACHE_ENTRIES])
+        
+        # Write then rename so an interrupted run can't leave a truncated cache
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._etag_cache, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Post scraper configuration: merchant domains, page selectors and keyword tables.
+Adjust what counts as a merchant link, a deal or page clutter here.
+"""
+
+# Single fluff words stripped from deal sentences when summarizing
+FLUFF_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'if', 'then', 'also', 'very', 'really', 'quite', 'just', 'only',
+    'even', 'still', 'now', 'today', 'here', 'there', 'this', 'that', 'these', 'those', 'some',
+    'any', 'all', 'each', 'every', 'no', 'not', 'can', 'could', 'will', 'would', 'should',
+    'may', 'might', 'must', 'shall', 'do', 'does', 'did', 'have', 'has', 'had', 'be', 'is',
+    'are', 'was', 'were', 'been', 'being', 'get', 'got', 'getting', 'make', 'made', 'making',
+    'take', 'took', 'taking', 'give', 'gave', 'giving', 'go', 'goes', 'went', 'going', 'come',
+    'came', 'coming', 'see', 'saw', 'seeing', 'know', 'knew', 'known', 'knowing', 'think',
+    'thought', 'thinking', 'say', 'said', 'saying', 'tell', 'told', 'telling', 'use', 'used',
+    'using', 'find', 'found', 'finding', 'work', 'worked', 'working', 'call', 'called',
+    'calling', 'try', 'tried', 'trying', 'ask', 'asked', 'asking', 'need', 'needed', 'needing',
+    'want', 'wanted', 'wanting', 'turn', 'turned', 'turning', 'put', 'putting', 'seem',
+    'seemed', 'seeming', 'look', 'looked', 'looking', 'feel', 'felt', 'feeling', 'leave',
+    'left', 'leaving', 'move', 'moved', 'moving', 'live', 'lived', 'living', 'believe',
+    'believed', 'believing', 'hold', 'held', 'holding', 'bring', 'brought', 'bringing',
+    'happen', 'happened', 'happening', 'write', 'wrote', 'written', 'writing', 'provide',
+    'provided', 'providing', 'sit', 'sat', 'sitting', 'stand', 'stood', 'standing', 'lose',
+    'lost', 'losing', 'pay', 'paid', 'paying', 'meet', 'met', 'meeting', 'include', 'included',
+    'including', 'continue', 'continued', 'continuing', 'set', 'setting', 'learn', 'learned',
+    'learning', 'change', 'changed', 'changing', 'lead', 'led', 'leading', 'understand',
+    'understood', 'understanding', 'watch', 'watched', 'watching', 'follow', 'followed',
+    'following', 'stop', 'stopped', 'stopping', 'create', 'created', 'creating', 'speak',
+    'spoke', 'spoken', 'speaking', 'read', 'reading', 'allow', 'allowed', 'allowing', 'add',
+    'added', 'adding', 'spend', 'spent', 'spending', 'grow', 'grew', 'grown', 'growing', 'open',
+    'opened', 'opening', 'walk', 'walked', 'walking', 'win', 'won', 'winning', 'offer',
+    'offered', 'offering', 'remember', 'remembered', 'remembering', 'love', 'loved', 'loving',
+    'consider', 'considered', 'considering', 'appear', 'appeared', 'appearing', 'buy', 'bought',
+    'buying', 'wait', 'waited', 'waiting', 'serve', 'served', 'serving', 'die', 'died', 'dying',
+    'send', 'sent', 'sending', 'expect', 'expected', 'expecting', 'build', 'built', 'building',
+    'stay', 'stayed', 'staying', 'fall', 'fell', 'fallen', 'falling', 'cut', 'cutting', 'reach',
+    'reached', 'reaching', 'kill', 'killed', 'killing', 'remain', 'remained', 'remaining',
+    'suggest', 'suggested', 'suggesting', 'raise', 'raised', 'raising', 'pass', 'passed',
+    'passing', 'sell', 'sold', 'selling', 'require', 'required', 'requiring', 'report',
+    'reported', 'reporting', 'decide', 'decided', 'deciding', 'pull', 'pulled', 'pulling', 'um',
+    'uh', 'hmm', 'well', 'like', 'basically', 'literally', 'actually', 'honestly', 'obviously',
+    'clearly', 'definitely', 'certainly', 'probably', 'maybe', 'perhaps', 'anyway', 'however',
+    'therefore', 'furthermore', 'moreover', 'nevertheless', 'meanwhile', 'otherwise', 'instead',
+    'besides', 'although', 'though', 'unless', 'until', 'while', 'since', 'because', 'when',
+    'where', 'what', 'why', 'how', 'who', 'which', 'whom', 'whose', 'amazing', 'awesome',
+    'incredible', 'fantastic', 'great', 'good', 'nice', 'cool', 'sweet', 'wow', 'omg', 'lol',
+    'haha', 'yes', 'ok', 'okay', 'sure', 'right', 'exactly', 'absolutely', 'totally',
+    'completely', 'perfectly', 'simply', 'easily', 'quickly', 'slowly', 'carefully', 'gently',
+    'softly', 'loudly', 'possibly', 'likely', 'unlikely', 'hopefully', 'unfortunately',
+    'luckily', 'surprisingly', 'interestingly', 'importantly', 'essentially', 'generally',
+    'specifically', 'particularly', 'especially', 'mainly', 'mostly', 'usually', 'normally',
+    'typically', 'often', 'sometimes', 'rarely', 'never', 'always', 'already', 'yet', 'again',
+    'once', 'twice', 'first', 'second', 'third', 'last', 'next', 'previous', 'final', 'initial',
+    'original', 'new', 'old', 'young', 'small', 'large', 'big', 'little', 'long', 'short',
+    'high', 'low', 'fast', 'slow', 'hot', 'cold', 'warm', 'wet', 'dry', 'clean', 'dirty',
+    'easy', 'hard', 'difficult', 'simple', 'complex', 'light', 'dark', 'bright', 'heavy',
+    'empty', 'full', 'closed', 'free', 'busy', 'quiet', 'loud', 'safe', 'dangerous', 'happy',
+    'sad', 'angry', 'excited', 'tired', 'hungry', 'thirsty', 'sick', 'healthy', 'rich', 'poor',
+    'strong', 'weak', 'smart', 'stupid', 'funny', 'serious', 'beautiful', 'ugly', 'interesting',
+    'boring', 'important', 'useful', 'useless', 'necessary', 'unnecessary', 'possible',
+    'impossible', 'correct', 'wrong', 'true', 'false', 'real', 'fake', 'public', 'private',
+    'local', 'global', 'national', 'international', 'popular', 'common', 'rare', 'special',
+    'normal', 'strange', 'different', 'same', 'similar', 'equal', 'better', 'worse', 'best',
+    'worst', 'more', 'less', 'most', 'least', 'enough'
+})
+
+# Multi-word fluff phrases; removed before the word filter runs
+FLUFF_PHRASES = ('you know', 'i mean', 'three times', 'too much', 'too little', 'too many', 'too few')
+
+# Largest post body read; bigger pages are skipped (or cut off when their size
+# isn't declared) so one runaway page can't balloon memory
+MAX_BODY_BYTES = 2_000_000
+
+# Content types worth parsing (a missing header is given the benefit of the doubt)
+HTML_CONTENT_TYPES = frozenset({'text/html', 'application/xhtml+xml', ''})
+
+# Most posts kept in the post cache; the least recently fetched are dropped on
+# save so the file (loaded in full on every run) stays bounded
+MAX_CACHE_ENTRIES = 1000
+
+# Merchant domains to look for (including shortlinks)
+MERCHANT_DOMAINS = frozenset({
+    'amazon.ca', 'amazon.com', 'amzn.to',  # Amazon shortlinks
+    'walmart.ca', 'walmart.com',
+    'bestbuy.ca', 'bestbuy.com',
+    'canadiantire.ca',
+    'staples.ca',
+    'thebay.com',
+    'sportchek.ca',
+    'marks.com',
+    'well.ca',
+    'chapters.indigo.ca',
+    'costco.ca',
+    'gap.ca',
+    'oldnavy.ca',
+    'bananarepublic.ca',
+    'lululemon.com',
+    'nike.com',
+    'adidas.ca',
+    'newegg.ca',
+    'memoryexpress.com',
+    'microsoft.com',
+    'apple.com',
+    'homedepot.ca',
+    'lowes.ca',
+    'canadianfreestuff.com',
+    'rakuten.ca',
+    'groupon.ca',
+    # Gaming platforms
+    'epicgames.com',
+    'store.epicgames.com',
+    'steam.com',
+    'store.steampowered.com',
+    'gog.com',
+    'playstation.com',
+    'xbox.com',
+    'nintendo.com',
+    'ubisoft.com',
+    'ea.com',
+    'origin.com',
+    'battle.net',
+    'blizzard.com',
+    # Restaurant/food chains
+    'swisschalet.com',
+    'harveys.ca',
+    'kfc.ca',
+    'mcdonalds.ca',
+    'timhortons.ca',
+    'starbucks.ca',
+    'subway.ca',
+    'pizzahut.ca',
+    'dominos.ca',
+    'ubereats.com',
+    'doordash.com',
+    'skipthedishes.com',
+})
+
+# Post body containers, tried in order
+CONTENT_SELECTORS = (
+    # Try SmartCanucks-specific selectors first
+    '.blog-content',
+    '.col-md-6.col-sm-7',
+    # Then try standard WordPress selectors
+    '.entry-content',
+    '.post-content',
+    '.content',
+    'article .content',
+    '.post-body',
+    'main article',
+    '.post',
+    'article',
+    '#content',
+    '.single-post-content',
+)
+
+# Ad blocks, social/share buttons and related-post lists stripped from content
+CLUTTER_SELECTOR = (
+    '.adthrive-ad, .ad, .advertisement, .ad-banner, .promo-box, '
+    '.social-share, .share-buttons, .related-posts, .tags, .categories'
+)
+
+# Containers searched for merchant links (first selector that matches wins)
+LINK_AREA_SELECTORS = (
+    '.blog-content',
+    '.col-md-6.col-sm-7',
+    '.entry-content',
+    '.post-content',
+    '.content',
+    'article .content',
+    'main article',
+    '.single-post-content',
+    '.post-body'
+)
+
+# Sentences mentioning any of these are kept in the summary
+DEAL_KEYWORDS = (
+    'deal', 'discount', 'sale', 'offer', 'promo', 'coupon', 'code', 'save', 'free', 'off',
+    'price', 'cost', 'buy', 'get', 'click', 'link', 'here', 'view', 'shop', 'store',
+    'amazon', 'walmart', 'bestbuy', 'canadian tire', 'epic games', 'steam', 'playstation',
+    'xbox', 'nintendo', 'apple', 'microsoft', 'google', 'samsung', 'sony', 'lg',
+    'percent', '%', '$', 'dollar', 'cad', 'usd', 'shipping', 'delivery', 'order',
+    'limited time', 'expires', 'until', 'while supplies last', 'today only'
+)
+
+# URL fragments that mark a generic product page
+PRODUCT_URL_KEYWORDS = ('product', 'item', 'deal')
+
+def _amazon_link_type(url_lower: str) -> str:
+    """Classify an Amazon link as a product, deal or other page."""
+    if '/dp/' in url_lower or '/gp/product/' in url_lower:
+        return 'amazon_product'
+    if '/deal/' in url_lower:  # also covers /gp/deal/
+        return 'amazon_deal'
+    return 'amazon_other'
+
+# Merchant markers checked against the lowercased link URL in order (first hit
+# wins), each with a function giving the link type for a URL containing it
+LINK_TYPE_RULES = (
+    ('amzn.to', lambda url_lower: 'amazon_product'),  # Amazon shortlinks
+    ('amazon', _amazon_link_type),
+    ('walmart', lambda url_lower: 'walmart_product' if '/ip/' in url_lower else 'walmart_other'),
+    ('bestbuy', lambda url_lower: 'bestbuy_product' if '/product/' in url_lower else 'bestbuy_other'),
+)
+
+# Hrefs containing any of these are internal, navigation or social links
+SKIP_PATTERNS = (
+    'smartcanucks.ca', 'facebook.com', 'twitter.com', 'instagram.com',
+    'pinterest.com', 'youtube.com', 'tiktok.com', 'linkedin.com',
+    '#', 'mailto:', 'tel:', 'javascript:', 'void(0)',
+    '/deals/', '/coupons/', '/flyers/', '/forum/', '/stores/',
+    'amazon.smartcanucks.ca', 'deals.smartcanucks.ca',
+    'coupons.smartcanucks.ca', 'flyers.smartcanucks.ca',
+    'forum.smartcanucks.ca', 'hotcanadadeals.ca'
+)
+
+# The site's own domains; links resolving here are never merchant deals
+INTERNAL_DOMAINS = frozenset({'smartcanucks.ca', 'hotcanadadeals.ca'})
+
+# Link text that marks site navigation rather than a deal
+NAVIGATION_TEXT = (
+    'home', 'blog', 'deals', 'coupons', 'flyers', 'forum', 'stores',
+    'contact', 'about', 'privacy', 'terms', 'subscribe', 'newsletter',
+    'follow us', 'share', 'comment', 'reply', 'more posts'
+)
+
+# Link text, parent text and URL fragments that suggest a deal link
+DEAL_TEXT_PATTERNS = (
+    'click here', 'view offer', 'get deal', 'shop now', 'buy now',
+    'order now', 'purchase', 'download', 'get it', 'grab it',
+    'check it out', 'see deal', 'view deal', 'get this',
+    'epic games', 'steam', 'amazon', 'walmart', 'best buy',
+    'get free', 'download free', 'claim', 'redeem',
+    'visit', 'go to', 'check out', 'see more', 'learn more',
+    'promo code', 'coupon', 'discount', 'save', 'sale'
+)
+
+DEAL_CONTEXT_PATTERNS = (
+    'deal', 'offer', 'promo', 'sale', 'discount', 'free',
+    'save', 'coupon', 'code', 'epic games', 'steam',
+    'amazon', 'walmart', 'click here', 'view'
+)
+
+DEAL_URL_PATTERNS = (
+    'deal', 'offer', 'promo', 'sale', 'discount', 'coupon',
+    'free', 'epicgames.com', 'steam', 'amazon', 'walmart',
+    'product', 'item', 'buy', 'shop', 'store'
+)
@@ -6,17 +6,65 @@ Usage: python rss_to_json.py [--url RSS_URL] [--output OUTPUT_FILE]
 
 import feedparser
 import json
+import logging
 import argparse
 import sys
-import time
 from pathlib import Path
 from urllib.error import URLError
 from datetime import datetime
 from affiliate_processor import AffiliateProcessor
 
+try:
+    import orjson  # Optional: much faster JSON encoding for large feeds
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
 # Default RSS feed URL - SmartCanucks Canadian deals and coupons
 DEFAULT_FEED_URL = "https://smartcanucks.ca/feed/"
 
+# Validators and parsed feed per URL from the last fetch, so repeated polls
+# in one process are conditional and a 304 skips the download and parse
+_feed_cache = {}
+
+# published_parsed is already UTC, so its fields are formatted directly
+_ISO_DATE_FORMAT = '%04d-%02d-%02dT%02d:%02d:%02dZ'
+
+
+def _to_entry(entry):
+    """
+    Convert one feedparser entry into an output entry.
+    
+    Args:
+        entry (dict): Feed entry as returned by feedparser
+        
+    Returns:
+        dict: Entry with title, link and published, or None if title or link is missing
+    """
+    title = entry.get('title')
+    link = entry.get('link')
+    
+    # Validate required fields (title and link)
+    if not title or not link:
+        logger.warning("Skipping entry without title or link: %s", title or 'No title')
+        return None
+    
+    # Convert published date to ISO format if available
+    published_parsed = entry.get('published_parsed')
+    published_iso = entry.get('published', '')
+    if published_parsed:
+        try:
+            published_iso = _ISO_DATE_FORMAT % published_parsed[:6]
+        except TypeError:
+            pass  # Keep the raw published string
+    
+    return {
+        'title': title.strip(),
+        'link': link.strip(),
+        'published': published_iso
+    }
+
 
 def parse_rss_feed(feed_url):
     """
@@ -29,12 +77,18 @@ def parse_rss_feed(feed_url):
         dict: Result with 'entries' key on success or 'error' key on failure
     """
     try:
-        print(f"Fetching RSS feed from: {feed_url}")
-        feed = feedparser.parse(feed_url)
+        logger.info("Fetching RSS feed from: %s", feed_url)
+        cached = _feed_cache.get(feed_url, {})
+        feed = feedparser.parse(feed_url, etag=cached.get('etag'), modified=cached.get('modified'))
+        
+        # Unchanged since the last poll: reuse the feed parsed then
+        if getattr(feed, 'status', None) == 304 and cached:
+            logger.info("Feed not modified, using cached entries")
+            feed = cached['feed']
         
         # Check for bozo errors (malformed feeds)
         if feed.bozo:
-            print(f"Warning: Feed is malformed - {feed.bozo_exception}")
+            logger.warning("Feed is malformed - %s", feed.bozo_exception)
             # Continue processing despite malformation as per PRP requirements
             
         # Check HTTP status if available
@@ -48,54 +102,37 @@ def parse_rss_feed(feed_url):
             elif feed.status != 200:
                 return {'error': f'HTTP error {feed.status}', 'status': feed.status}
                 
+        # Remember validators so the next poll can be conditional
+        etag = feed.get('etag')
+        modified = feed.get('modified')
+        if etag or modified:
+            _feed_cache[feed_url] = {'etag': etag, 'modified': modified, 'feed': feed}
+        
         # Check for entries
         if not feed.entries:
             return {'error': 'No entries found in feed', 'entries': []}
             
-        # Process entries with validation
-        entries = []
-        for entry in feed.entries:
-            # Validate required fields (title and link)
-            if entry.get('title') and entry.get('link'):
-                # Convert published date to ISO format if available
-                published_iso = ''
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    try:
-                        published_iso = time.strftime('%Y-%m-%dT%H:%M:%SZ', entry.published_parsed)
-                    except:
-                        published_iso = entry.get('published', '')
-                else:
-                    published_iso = entry.get('published', '')
-                
-                entries.append({
-                    'title': entry.title.strip(),
-                    'link': entry.link.strip(),
-                    'published': published_iso
-                })
-            else:
-                print(f"Warning: Skipping entry without title or link: {entry.get('title', 'No title')}")
+        # Process entries with validation (invalid ones come back as None)
+        entries = [entry for entry in map(_to_entry, feed.entries) if entry is not None]
                 
         # Validate we have at least one valid entry
         if not entries:
             return {'error': 'No valid entries found (missing title or link)', 'entries': []}
             
-        print(f"Successfully parsed {len(entries)} valid entries")
+        logger.info("Successfully parsed %d valid entries", len(entries))
         
         # Process affiliate links
-        print("Processing affiliate links...")
+        logger.info("Processing affiliate links...")
         processor = AffiliateProcessor()
-        processed_entries = []
-        
-        for entry in entries:
-            processed_entry = processor.process_rss_entry(entry.copy())
-            processed_entries.append(processed_entry)
+        processed_entries = processor.process_rss_entries(entries)
         
         # Print affiliate processing statistics
         stats = processor.get_stats()
-        print(f"Affiliate processing complete:")
-        print(f"  - Processed: {stats['processed']} links")
-        print(f"  - Skipped: {stats['skipped']} links")
-        print(f"  - Success rate: {stats['success_rate']:.1f}%")
+        logger.info(
+            "Affiliate processing complete: %d processed, %d skipped, %.1f%% success rate",
+            stats['processed'], stats['skipped'], stats['success_rate'],
+        )
+        processor.log_error_summary()
         
         return {'entries': processed_entries}
         
@@ -114,6 +151,7 @@ def main():
                         help='Output JSON file path')
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
     
     # Validate URL format
     if not args.url.startswith(('http://', 'https://')):
@@ -140,8 +178,12 @@ def main():
     
     # Write to file
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, ensure_ascii=False)
         
         print(f"Successfully wrote {len(result['entries'])} entries to {output_path}")
         
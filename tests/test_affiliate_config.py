@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Unit tests for affiliate domain matching.
+Run with: python -m pytest tests/test_affiliate_config.py -v
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the scripts directory to the path so we can import the config
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from affiliate_config import match_affiliate_domain, get_affiliate_tag, should_resolve_link
+
+
+class TestMatchAffiliateDomain(unittest.TestCase):
+    """Test cases for matching hosts to configured affiliate domains."""
+    
+    def test_subdomains_match(self):
+        """www. and other subdomains map to their affiliate domain."""
+        self.assertEqual(match_affiliate_domain('amazon.ca'), 'amazon.ca')
+        self.assertEqual(match_affiliate_domain('www.amazon.ca'), 'amazon.ca')
+        self.assertEqual(match_affiliate_domain('smile.amazon.ca'), 'amazon.ca')
+        self.assertEqual(match_affiliate_domain('WWW.Amazon.CA:443'), 'amazon.ca')
+    
+    def test_lookalike_hosts_do_not_match(self):
+        """Hosts that merely contain an affiliate domain are not that merchant."""
+        self.assertIsNone(match_affiliate_domain('amazon.ca.evil.com'))
+        self.assertIsNone(match_affiliate_domain('notamazon.ca'))
+        self.assertIsNone(match_affiliate_domain('amazon.ca-deals.com'))
+        self.assertIsNone(match_affiliate_domain('com'))
+    
+    def test_userinfo_is_not_the_host(self):
+        """A merchant name before '@' doesn't make the link that merchant's."""
+        self.assertIsNone(match_affiliate_domain('amazon.ca@evil.com'))
+    
+    def test_lookalike_host_gets_no_tag(self):
+        """A configured tag is never added to a lookalike host."""
+        with patch.dict('affiliate_config._TAG_BY_HOST', {'amazon.ca': 'mytag-20'}):
+            self.assertEqual(get_affiliate_tag('www.amazon.ca'), 'mytag-20')
+            self.assertIsNone(get_affiliate_tag('amazon.ca.evil.com'))
+
+
+class TestShouldResolveLink(unittest.TestCase):
+    """Test cases for deciding which feed links are worth resolving."""
+    
+    def test_merchant_and_redirector_links(self):
+        """Merchant hosts, shorteners and redirect paths are resolved."""
+        self.assertTrue(should_resolve_link('https://www.amazon.ca/Lamp/dp/B08N5WRWNW'))
+        self.assertTrue(should_resolve_link('https://amzn.to/3abcDEF'))
+        self.assertTrue(should_resolve_link('https://smartcanucks.ca/go/lamp-deal'))
+    
+    def test_lookalike_hosts_are_not_resolved(self):
+        """Lookalike hosts without a redirect path are left alone."""
+        self.assertFalse(should_resolve_link('https://amazon.ca.evil.com/Lamp/dp/B08N5WRWNW'))
+        self.assertFalse(should_resolve_link('https://notamazon.ca/deal'))
+        self.assertFalse(should_resolve_link('https://bit.ly.evil.com/abc'))
+        self.assertFalse(should_resolve_link('https://amazon.ca@evil.com/deal'))
+    
+    def test_malformed_url(self):
+        """A URL urlsplit rejects is not resolved rather than raising."""
+        self.assertFalse(should_resolve_link('http://[broken/post'))
+    
+    def test_plain_links(self):
+        """Ordinary blog links are not resolved."""
+        self.assertFalse(should_resolve_link('https://smartcanucks.ca/some-deal-post/'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
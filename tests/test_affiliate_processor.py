@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Unit tests for affiliate link processing.
+Run with: python -m pytest tests/test_affiliate_processor.py -v
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the scripts directory to the path so we can import the processor
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from affiliate_processor import AffiliateProcessor
+
+
+class TestProcessRSSEntries(unittest.TestCase):
+    """Test cases for batch processing of feed entries."""
+    
+    def test_malformed_link_is_kept(self):
+        """A link urlsplit can't parse is left unchanged instead of failing the batch."""
+        processor = AffiliateProcessor()
+        with patch.object(processor.resolver, 'resolve_url') as mock_resolve:
+            entries = processor.process_rss_entries([
+                {'title': 'Broken', 'link': 'http://[broken/post'},
+                {'title': 'Plain', 'link': 'https://example.com/post'},
+            ])
+            
+            # Neither link can become an affiliate link, so nothing is resolved
+            mock_resolve.assert_not_called()
+        
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['link'], 'http://[broken/post')
+        self.assertFalse(entries[0]['affiliate_processed'])
+        self.assertEqual(entries[1]['link'], 'https://example.com/post')
+    
+    def test_direct_merchant_link_gets_tag(self):
+        """A direct merchant product link is tagged without a network call."""
+        processor = AffiliateProcessor()
+        with patch.dict('affiliate_config._TAG_BY_HOST', {'amazon.ca': 'mytag-20'}):
+            with patch.object(processor.resolver.session, 'head') as mock_head:
+                entries = processor.process_rss_entries([
+                    {'title': 'Deal', 'link': 'https://www.amazon.ca/Lamp/dp/B08N5WRWNW?ref=x'},
+                ])
+                mock_head.assert_not_called()
+        
+        self.assertTrue(entries[0]['affiliate_processed'])
+        self.assertIn('tag=mytag-20', entries[0]['link'])
+        self.assertNotIn('ref=x', entries[0]['link'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
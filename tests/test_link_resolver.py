@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Unit tests for redirect following in the link resolver.
+Run with: python -m pytest tests/test_link_resolver.py -v
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import requests
+
+# Add the scripts directory to the path so we can import the resolver
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from link_resolver import LinkResolver
+
+
+def make_response(status_code, location=None):
+    """Build a response stub with a status and an optional Location header."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.is_redirect = location is not None and status_code in (301, 302, 303, 307, 308)
+    response.headers = {'Location': location} if location is not None else {}
+    return response
+
+
+class TestFollowRedirects(unittest.TestCase):
+    """Test cases for following tracker redirect chains."""
+    
+    def setUp(self):
+        """Create a resolver with a short redirect limit."""
+        self.resolver = LinkResolver(max_redirects=3)
+    
+    def test_relative_location(self):
+        """A relative Location header is resolved against the current URL."""
+        with patch.object(self.resolver.session, 'head') as mock_head:
+            mock_head.side_effect = [
+                make_response(302, '/go/next'),
+                make_response(301, 'https://www.amazon.ca/Lamp/dp/B08N5WRWNW'),
+                make_response(200),
+            ]
+            final_url = self.resolver._follow_redirects('https://deals.example.com/r/abc')
+        
+        self.assertEqual(final_url, 'https://www.amazon.ca/Lamp/dp/B08N5WRWNW')
+        self.assertEqual(mock_head.call_args_list[1][0][0], 'https://deals.example.com/go/next')
+    
+    def test_redirect_loop(self):
+        """A chain longer than max_redirects raises instead of looping forever."""
+        with patch.object(self.resolver.session, 'head') as mock_head:
+            mock_head.side_effect = lambda url, **kwargs: make_response(302, url)
+            with self.assertRaises(requests.TooManyRedirects):
+                self.resolver._follow_redirects('https://deals.example.com/loop')
+        
+        self.assertEqual(mock_head.call_count, 4)
+    
+    def test_redirect_loop_keeps_original_url(self):
+        """resolve_url falls back to the original link when the chain loops."""
+        url = 'https://deals.example.com/loop'
+        with patch.object(self.resolver.session, 'head') as mock_head:
+            mock_head.side_effect = lambda url, **kwargs: make_response(302, url)
+            self.assertEqual(self.resolver.resolve_url(url), url)
+        
+        self.assertEqual(self.resolver.error_counts['resolve'], 1)
+    
+    def test_head_not_allowed_falls_back_to_get(self):
+        """A 405 to HEAD retries that hop with a streamed GET."""
+        get_response = make_response(301, 'https://www.walmart.ca/en/ip/thing/123')
+        with patch.object(self.resolver.session, 'head') as mock_head, \
+                patch.object(self.resolver.session, 'get') as mock_get:
+            mock_head.side_effect = [make_response(405), make_response(200)]
+            mock_get.return_value = get_response
+            final_url = self.resolver._follow_redirects('https://deals.example.com/nohead')
+        
+        self.assertEqual(final_url, 'https://www.walmart.ca/en/ip/thing/123')
+        mock_get.assert_called_once()
+        self.assertTrue(mock_get.call_args[1]['stream'])
+        get_response.close.assert_called_once()
+    
+    def test_no_redirect(self):
+        """A URL that doesn't redirect is returned as is."""
+        with patch.object(self.resolver.session, 'head', return_value=make_response(200)):
+            final_url = self.resolver._follow_redirects('https://www.bestbuy.ca/en-ca/product/12345678')
+        
+        self.assertEqual(final_url, 'https://www.bestbuy.ca/en-ca/product/12345678')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for content and link extraction from scraped posts.
+Run with: python -m pytest tests/test_post_extractor.py -v
+"""
+
+import unittest
+import sys
+import os
+
+# Add the scripts directory to the path so we can import the extractor
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from post_extractor import PostExtractor, _parse_html
+
+POST_URL = 'https://smartcanucks.ca/some-deal-post/'
+
+# .post-body is the content element, but links are searched in 'main article',
+# which also holds the sidebar and a related-posts list
+MAIN_ARTICLE_POST = b"""<html><head><title>Lamp Deal</title></head><body>
+<main><article>
+<aside class="sidebar">Sidebar: huge TV sale $999 at the store, see all our other offers here today</aside>
+<div class="post-body">
+<p>Get 25% off the cordless lamp at Amazon Canada, now only $19.99 with code LAMP25 until March 30.</p>
+<div class="tags"><a href="https://example.org/tag/lamps">Lamp deals tag page</a></div>
+<a href="https://www.amazon.ca/Lamp/dp/B08N5WRWNW">Cordless lamp</a>
+</div>
+<div class="related-posts"><a href="https://www.walmart.ca/en/ip/thing/123">Walmart lamp deal</a></div>
+</article></main>
+</body></html>"""
+
+# The whole article is the content element, but links are searched in the
+# nested .single-post-content only
+SINGLE_POST_CONTENT_POST = b"""<html><head><title>Headphones Deal</title></head><body>
+<article>
+<p>Best Buy is taking 40% off headphones this weekend, prices from $49.99 until Sunday 10 for members.</p>
+<div class="single-post-content">
+<p>Our editors picked these wireless headphones for the weekend roundup.</p>
+<a href="https://www.bestbuy.ca/en-ca/product/headphones/12345678">Shop headphones</a>
+</div>
+</article>
+</body></html>"""
+
+# The usual WordPress shape: .entry-content is both the content element and
+# the link area, with the tag list and related posts inside it
+ENTRY_CONTENT_POST = b"""<html><head><title>Lamp Deal</title></head><body>
+<div class="entry-content">
+<p>Get 25% off the cordless lamp at Amazon Canada, now only $19.99 with code LAMP25 until March 30.</p>
+<a href="https://www.amazon.ca/Lamp/dp/B08N5WRWNW">Cordless lamp</a>
+<div class="tags"><a href="https://www.walmart.ca/en/ip/tagged/456">Walmart tag link</a></div>
+<div class="related-posts">Related: <a href="https://www.walmart.ca/en/ip/thing/123">Walmart lamp deal</a></div>
+</div>
+</body></html>"""
+
+
+class TestExtractAll(unittest.TestCase):
+    """Test cases for content and link extraction from one parsed post."""
+    
+    def setUp(self):
+        """Create an extractor to run over each page."""
+        self.extractor = PostExtractor()
+    
+    def extract(self, html):
+        """Parse a page and run every extractor on it."""
+        return self.extractor.extract_all(_parse_html(html), POST_URL)
+    
+    def test_content_uses_content_selector_priority(self):
+        """Content comes from .post-body, not the 'main article' link area around it."""
+        result = self.extract(MAIN_ARTICLE_POST)
+        
+        self.assertTrue(result['content'].startswith('Get 25% off'))
+        self.assertNotIn('Sidebar', result['content'])
+        
+        # Sidebar prices must not leak into the deal info
+        self.assertEqual(result['deal_info']['discount_percentage'], 25)
+        self.assertIsNone(result['deal_info']['original_price'])
+        self.assertEqual(result['deal_info']['coupon_code'], 'LAMP25')
+        self.assertEqual(result['deal_info']['expiry_date'], 'March 30')
+    
+    def test_link_areas_keep_related_posts_outside_content(self):
+        """Related-post links outside the content element are still found."""
+        result = self.extract(MAIN_ARTICLE_POST)
+        urls = [link['url'] for link in result['merchant_links']]
+        
+        self.assertIn('https://www.amazon.ca/Lamp/dp/B08N5WRWNW', urls)
+        self.assertIn('https://www.walmart.ca/en/ip/thing/123', urls)
+        
+        # The tag list inside the content element is stripped along with the content
+        self.assertNotIn('https://example.org/tag/lamps', urls)
+    
+    def test_shared_element_drops_related_posts(self):
+        """When content and links share .entry-content, its related posts and tags are stripped."""
+        result = self.extract(ENTRY_CONTENT_POST)
+        urls = [link['url'] for link in result['merchant_links']]
+        
+        self.assertEqual(urls, ['https://www.amazon.ca/Lamp/dp/B08N5WRWNW'])
+        self.assertNotIn('Related', result['content'])
+    
+    def test_content_uses_outer_article(self):
+        """Content covers the whole article even though links come from .single-post-content."""
+        result = self.extract(SINGLE_POST_CONTENT_POST)
+        
+        self.assertTrue(result['content'].startswith('Best Buy is taking 40% off'))
+        self.assertEqual(result['deal_info']['discount_percentage'], 40)
+        
+        links = result['merchant_links']
+        self.assertEqual(len(links), 1)
+        self.assertEqual(links[0]['merchant'], 'bestbuy')
+        self.assertEqual(links[0]['link_type'], 'bestbuy_product')
+    
+    def test_no_content(self):
+        """A page without any content container reports no content and no links."""
+        result = self.extract(b'<html><body><p>Hi</p></body></html>')
+        
+        self.assertEqual(result['content'], 'No content found')
+        self.assertEqual(result['merchant_links'], [])
+
+
+class TestExtractDealInfo(unittest.TestCase):
+    """Test cases for pulling deal details out of post text."""
+    
+    def setUp(self):
+        """Create an extractor to run over each text."""
+        self.extractor = PostExtractor()
+    
+    def test_discount_after_expiry(self):
+        """A discount right after an expiry date ("until Sunday 50% off") is still found."""
+        deal_info = self.extractor._extract_deal_info('Sale runs until Sunday 50% off everything, was $40 now $20')
+        
+        self.assertEqual(deal_info['discount_percentage'], 50)
+        self.assertEqual(deal_info['expiry_date'], 'Sunday 50')
+        self.assertEqual(deal_info['original_price'], 40.0)
+        self.assertEqual(deal_info['sale_price'], 20.0)
+    
+    def test_discount_after_coupon(self):
+        """A discount right after a coupon code ("code: SAVE20 20% off") is still found."""
+        deal_info = self.extractor._extract_deal_info('Use code: SAVE20 20% off at checkout until March 30')
+        
+        self.assertEqual(deal_info['coupon_code'], 'SAVE20')
+        self.assertEqual(deal_info['discount_percentage'], 20)
+        self.assertEqual(deal_info['expiry_date'], 'March 30')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Unit tests for fetching and caching scraped posts.
+Run with: python -m pytest tests/test_post_fetcher.py -v
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Add the scripts directory to the path so we can import the fetcher
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import post_fetcher
+from post_fetcher import PostFetcher
+from post_scraper import PostScraper
+
+POST_URL = 'https://smartcanucks.ca/some-deal-post/'
+
+POST_HTML = b"""<html><head><title>Lamp Deal</title></head><body>
+<div class="entry-content">
+<p>Get 25% off the cordless lamp at Amazon Canada, now only $19.99 with code LAMP25 until March 30.</p>
+<a href="https://www.amazon.ca/Lamp/dp/B08N5WRWNW">Cordless lamp</a>
+</div>
+</body></html>"""
+
+
+def make_response(status_code, body=b'', headers=None):
+    """Build a streamed response stub as session.get(..., stream=True) returns it."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {'Content-Type': 'text/html; charset=utf-8', **(headers or {})}
+    response.encoding = 'utf-8'
+    response.raw.read.return_value = body
+    return response
+
+
+class TestPostCacheFile(unittest.TestCase):
+    """Test cases for persisting the post cache between runs."""
+    
+    def setUp(self):
+        """Point the cache at a fresh temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, 'cache', 'posts.json')
+    
+    def tearDown(self):
+        """Remove the temporary cache directory."""
+        self.tmp_dir.cleanup()
+    
+    def entry(self, fetched_at):
+        """A cache entry as scrape_post stores it."""
+        return {
+            'etag': '"v1"',
+            'last_modified': None,
+            'fetched_at': fetched_at,
+            'post_data': {'url': 'u', 'merchant_links': []},
+        }
+    
+    def test_save_and_reload(self):
+        """Saved entries are loaded by the next fetcher using the same path."""
+        fetcher = PostFetcher(delay_range=None, cache_path=self.cache_path)
+        fetcher._etag_cache['https://example.com/a'] = self.entry(100.0)
+        fetcher.save_cache()
+        
+        reloaded = PostFetcher(delay_range=None, cache_path=self.cache_path)
+        self.assertEqual(reloaded._etag_cache, {'https://example.com/a': self.entry(100.0)})
+    
+    def test_save_keeps_most_recently_fetched(self):
+        """Past MAX_CACHE_ENTRIES, the least recently fetched posts are dropped."""
+        fetcher = PostFetcher(delay_range=None, cache_path=self.cache_path)
+        for i in range(5):
+            fetcher._etag_cache[f'https://example.com/{i}'] = self.entry(float(i))
+        
+        # An entry written before fetched_at existed is evicted first
+        legacy = self.entry(0)
+        del legacy['fetched_at']
+        fetcher._etag_cache['https://example.com/legacy'] = legacy
+        
+        with patch.object(post_fetcher, 'MAX_CACHE_ENTRIES', 3):
+            fetcher.save_cache()
+        
+        with open(self.cache_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        self.assertEqual(sorted(saved), [f'https://example.com/{i}' for i in (2, 3, 4)])
+    
+    def test_unreadable_cache_is_ignored(self):
+        """A corrupt cache file starts the fetcher with an empty cache."""
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            f.write('{not json')
+        
+        fetcher = PostFetcher(delay_range=None, cache_path=self.cache_path)
+        self.assertEqual(fetcher._etag_cache, {})
+    
+    def test_non_object_cache_is_ignored(self):
+        """A cache file holding valid JSON that isn't an object is replaced on save."""
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            f.write('[]')
+        
+        fetcher = PostFetcher(delay_range=None, cache_path=self.cache_path)
+        self.assertEqual(fetcher._etag_cache, {})
+        
+        fetcher._etag_cache['https://example.com/a'] = self.entry(100.0)
+        fetcher.save_cache()
+        with open(self.cache_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {'https://example.com/a': self.entry(100.0)})
+
+
+class TestConditionalFetch(unittest.TestCase):
+    """Test cases for revalidating and reusing cached posts."""
+    
+    def setUp(self):
+        """Create a scraper that doesn't sleep between posts."""
+        self.scraper = PostScraper(delay_range=None)
+        self.fetcher = self.scraper.fetcher
+    
+    def test_not_modified_reuses_cached_post(self):
+        """A 304 to If-None-Match returns the cached post without parsing."""
+        with patch.object(self.fetcher.session, 'get') as mock_get:
+            mock_get.return_value = make_response(200, POST_HTML, {'ETag': '"v1"'})
+            first = self.scraper.scrape_post(POST_URL)
+            
+            fetched_at = self.fetcher._etag_cache[POST_URL]['fetched_at']
+            mock_get.return_value = make_response(304)
+            with patch('post_scraper._parse_html') as mock_parse:
+                second = self.scraper.scrape_post(POST_URL)
+                mock_parse.assert_not_called()
+        
+        self.assertEqual(len(first['merchant_links']), 1)
+        self.assertEqual(mock_get.call_args[1]['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(
+            {**second, 'scraped_at': None},
+            {**first, 'scraped_at': None},
+        )
+        self.assertGreaterEqual(self.fetcher._etag_cache[POST_URL]['fetched_at'], fetched_at)
+    
+    def test_last_modified_is_revalidated(self):
+        """Last-Modified is sent back as If-Modified-Since."""
+        stamp = 'Wed, 14 Oct 2026 10:00:00 GMT'
+        with patch.object(self.fetcher.session, 'get') as mock_get:
+            mock_get.return_value = make_response(200, POST_HTML, {'Last-Modified': stamp})
+            self.scraper.scrape_post(POST_URL)
+            
+            mock_get.return_value = make_response(304)
+            self.scraper.scrape_post(POST_URL)
+        
+        self.assertEqual(mock_get.call_args[1]['headers'], {'If-Modified-Since': stamp})
+    
+    def test_no_validators_not_cached(self):
+        """Without max_age, a response without ETag or Last-Modified isn't cached."""
+        with patch.object(self.fetcher.session, 'get', return_value=make_response(200, POST_HTML)):
+            self.scraper.scrape_post(POST_URL)
+        
+        self.assertEqual(self.fetcher._etag_cache, {})
+    
+    def test_no_validators_reused_within_max_age(self):
+        """With max_age set, a post served without validators is still reused."""
+        self.fetcher.max_age = 3600
+        with patch.object(self.fetcher.session, 'get', return_value=make_response(200, POST_HTML)) as mock_get:
+            first = self.scraper.scrape_post(POST_URL)
+            second = self.scraper.scrape_post(POST_URL)
+        
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args[1]['headers'], {})
+        self.assertEqual(
+            {**second, 'scraped_at': None},
+            {**first, 'scraped_at': None},
+        )
+    
+    def test_no_validators_refetched_after_max_age(self):
+        """Once stale, a post without validators is fetched again unconditionally."""
+        self.fetcher.max_age = 3600
+        with patch.object(self.fetcher.session, 'get', return_value=make_response(200, POST_HTML)) as mock_get:
+            self.scraper.scrape_post(POST_URL)
+            self.fetcher._etag_cache[POST_URL]['fetched_at'] -= 7200
+            self.scraper.scrape_post(POST_URL)
+        
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_get.call_args[1]['headers'], {})
+    
+    def test_fresh_post_skips_request(self):
+        """Within max_age a cached post is returned without any request."""
+        self.fetcher.max_age = 3600
+        self.fetcher._etag_cache[POST_URL] = {
+            'etag': '"v1"',
+            'last_modified': None,
+            'fetched_at': time.time() - 60,
+            'post_data': {'url': POST_URL, 'merchant_links': []},
+        }
+        
+        with patch.object(self.fetcher.session, 'get') as mock_get:
+            post_data = self.scraper.scrape_post(POST_URL)
+            mock_get.assert_not_called()
+        
+        self.assertEqual(post_data['url'], POST_URL)
+        self.assertIn('scraped_at', post_data)
+    
+    def test_stale_post_is_revalidated(self):
+        """Past max_age a cached post is revalidated with a conditional GET."""
+        self.fetcher.max_age = 3600
+        self.fetcher._etag_cache[POST_URL] = {
+            'etag': '"v1"',
+            'last_modified': None,
+            'fetched_at': time.time() - 7200,
+            'post_data': {'url': POST_URL, 'merchant_links': []},
+        }
+        
+        with patch.object(self.fetcher.session, 'get', return_value=make_response(304)) as mock_get:
+            post_data = self.scraper.scrape_post(POST_URL)
+        
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args[1]['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(post_data['merchant_links'], [])
+    
+    def test_no_max_age_always_revalidates(self):
+        """Without max_age even a just-fetched post is revalidated."""
+        self.fetcher._etag_cache[POST_URL] = {
+            'etag': '"v1"',
+            'last_modified': None,
+            'fetched_at': time.time(),
+            'post_data': {'url': POST_URL, 'merchant_links': []},
+        }
+        
+        self.assertIsNone(self.fetcher.cached_post(POST_URL))
+
+
+class TestBodyLimits(unittest.TestCase):
+    """Test cases for skipping oversize post bodies."""
+    
+    def setUp(self):
+        """Create a fetcher that doesn't sleep and caches everything."""
+        self.fetcher = PostFetcher(delay_range=None, max_age=3600)
+    
+    def test_declared_oversize_body_is_skipped(self):
+        """A Content-Length over the cap is skipped without reading the body."""
+        response = make_response(200, headers={'Content-Length': '65'})
+        with patch.object(post_fetcher, 'MAX_BODY_BYTES', 64), \
+                patch.object(self.fetcher.session, 'get', return_value=response):
+            fetched = self.fetcher.fetch(POST_URL)
+        
+        self.assertEqual(fetched['post_data']['skipped'], 'too-large')
+        self.assertEqual(fetched['post_data']['content_length'], 65)
+        response.raw.read.assert_not_called()
+    
+    def test_streamed_oversize_body_is_skipped(self):
+        """Without Content-Length, a body running past the cap is skipped, not truncated."""
+        response = make_response(200, headers={'Transfer-Encoding': 'chunked', 'ETag': '"v1"'})
+        response.raw.read.side_effect = [b'x' * 64, b'x']
+        with patch.object(post_fetcher, 'MAX_BODY_BYTES', 64), \
+                patch.object(self.fetcher.session, 'get', return_value=response):
+            with self.assertLogs('post_fetcher', level='WARNING'):
+                fetched = self.fetcher.fetch(POST_URL)
+        
+        self.assertEqual(fetched['post_data']['skipped'], 'too-large')
+        self.assertIsNone(fetched['post_data']['content_length'])
+        self.assertNotIn('body', fetched)
+    
+    def test_streamed_body_at_cap_is_kept(self):
+        """A body that ends exactly at the cap is complete and returned for parsing."""
+        response = make_response(200, headers={'Transfer-Encoding': 'chunked'})
+        response.raw.read.side_effect = [b'x' * 64, b'']
+        with patch.object(post_fetcher, 'MAX_BODY_BYTES', 64), \
+                patch.object(self.fetcher.session, 'get', return_value=response):
+            fetched = self.fetcher.fetch(POST_URL)
+        
+        self.assertEqual(fetched['body'], b'x' * 64)
+    
+    def test_skipped_post_is_not_cached(self):
+        """A skipped oversize post leaves nothing in the cache for later runs."""
+        scraper = PostScraper(delay_range=None, max_age=3600)
+        response = make_response(200, headers={'ETag': '"v1"'})
+        response.raw.read.side_effect = [b'x' * 64, b'x']
+        with patch.object(post_fetcher, 'MAX_BODY_BYTES', 64), \
+                patch.object(scraper.fetcher.session, 'get', return_value=response):
+            post_data = scraper.scrape_post(POST_URL)
+        
+        self.assertEqual(post_data['skipped'], 'too-large')
+        self.assertEqual(scraper.fetcher._etag_cache, {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -16,7 +16,8 @@ from pathlib import Path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
 try:
-    from rss_to_json import parse_rss_feed, main
+    import feedparser
+    from rss_to_json import parse_rss_feed, main, _feed_cache
 except ImportError as e:
     print(f"Error importing RSS fetcher: {e}")
     sys.exit(1)
@@ -195,6 +196,69 @@ class TestRSSFetcher(unittest.TestCase):
             self.assertEqual(result['entries'][1]['published'], '')
 
 
+class TestFeedCache(unittest.TestCase):
+    """Test cases for conditional polling of the feed."""
+    
+    FEED_URL = 'https://example.com/feed.xml'
+    
+    def setUp(self):
+        """Start every test without validators from earlier polls."""
+        _feed_cache.clear()
+    
+    def tearDown(self):
+        """Leave no validators behind for other tests."""
+        _feed_cache.clear()
+    
+    def make_feed(self, status, entries=(), **validators):
+        """Build a parsed feed as feedparser returns it for an HTTP fetch."""
+        return feedparser.FeedParserDict(
+            bozo=False,
+            status=status,
+            entries=[feedparser.FeedParserDict(entry) for entry in entries],
+            **validators
+        )
+    
+    def test_not_modified_reuses_cached_entries(self):
+        """A 304 reuses the entries parsed on the previous poll."""
+        first = self.make_feed(
+            200,
+            [{'title': 'Test Post 1', 'link': 'https://example.com/post1', 'published': '2024-01-17T10:00:00Z'}],
+            etag='"feed-v1"',
+            modified='Wed, 17 Jan 2024 10:00:00 GMT',
+        )
+        not_modified = self.make_feed(304)
+        
+        with patch('feedparser.parse', side_effect=[first, not_modified]) as mock_parse:
+            first_result = parse_rss_feed(self.FEED_URL)
+            second_result = parse_rss_feed(self.FEED_URL)
+        
+        # The first poll sends no validators; the second sends the stored ones
+        self.assertEqual(mock_parse.call_args_list[0][1], {'etag': None, 'modified': None})
+        self.assertEqual(
+            mock_parse.call_args_list[1][1],
+            {'etag': '"feed-v1"', 'modified': 'Wed, 17 Jan 2024 10:00:00 GMT'},
+        )
+        
+        self.assertNotIn('error', second_result)
+        self.assertEqual(second_result['entries'], first_result['entries'])
+        self.assertEqual(second_result['entries'][0]['title'], 'Test Post 1')
+    
+    def test_not_modified_without_cache(self):
+        """A 304 with nothing cached is reported rather than treated as empty."""
+        with patch('feedparser.parse', return_value=self.make_feed(304)):
+            result = parse_rss_feed(self.FEED_URL)
+        
+        self.assertEqual(result.get('status'), 304)
+    
+    def test_feed_without_validators_not_cached(self):
+        """A feed served without ETag or Last-Modified isn't cached."""
+        feed = self.make_feed(200, [{'title': 'Test Post 1', 'link': 'https://example.com/post1'}])
+        with patch('feedparser.parse', return_value=feed):
+            parse_rss_feed(self.FEED_URL)
+        
+        self.assertEqual(_feed_cache, {})
+
+
 class TestMainFunction(unittest.TestCase):
     """Test cases for the main CLI function."""
     